@@ -0,0 +1,87 @@
+"""
+Benchmarks the content extractor backends on a corpus of saved HTML pages,
+reporting throughput (docs/s) and text overlap with the newspaper3k output.
+
+The corpus is a directory of .html files. An optional urls.json in the same
+directory maps file names to page URLs, so per-site rules are applied.
+
+Usage:
+    python benchmarks/bench_extractors.py path/to/html_corpus
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crawler'))
+
+from config import EXTRACTOR_MIN_TEXT_LENGTH
+from extractor import EXTRACTORS, extract_main_content
+from indexer import tokenize
+
+
+def load_corpus(corpus_dir):
+    url_map_path = os.path.join(corpus_dir, 'urls.json')
+    url_map = {}
+    if os.path.exists(url_map_path):
+        with open(url_map_path, 'r', encoding='utf-8') as file:
+            url_map = json.load(file)
+    pages = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(corpus_dir, name), 'r', encoding='utf-8', errors='replace') as file:
+                pages.append((url_map.get(name, f"https://localhost/{name}"), file.read()))
+    return pages
+
+
+def token_f1(text, reference):
+    """Bag-of-words F1 between an extracted text and the reference text."""
+    tokens, reference_tokens = Counter(tokenize(text)), Counter(tokenize(reference))
+    if not tokens and not reference_tokens:
+        return 1.0
+    overlap = sum((tokens & reference_tokens).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(tokens.values())
+    recall = overlap / sum(reference_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def extract_all(extract, pages):
+    start = time.perf_counter()
+    texts = [extract(html, url) or '' for url, html in pages]
+    return texts, time.perf_counter() - start
+
+
+def report(name, texts, elapsed, references):
+    scores = [token_f1(text, reference) for text, reference in zip(texts, references)]
+    short = sum(len(text) < EXTRACTOR_MIN_TEXT_LENGTH for text in texts)
+    print(f"{name:<10} {len(texts) / elapsed:>9.1f} {statistics.mean(scores):>9.3f} "
+          f"{statistics.median(scores):>9.3f} {short:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the content extractor backends.')
+    parser.add_argument('corpus_dir', help='Directory of saved .html pages')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir)
+    if not pages:
+        sys.exit(f"No .html files found in {args.corpus_dir}")
+
+    print(f"{len(pages)} pages; overlap is token F1 against newspaper3k\n")
+    print(f"{'backend':<10} {'docs/s':>9} {'mean F1':>9} {'median F1':>9} {'short':>7}")
+    # newspaper3k is the reference, so its own row always scores 1.0
+    references, elapsed = extract_all(EXTRACTORS['newspaper'], pages)
+    report('newspaper', references, elapsed, references)
+    for name, extract in EXTRACTORS.items():
+        if name != 'newspaper':
+            report(name, *extract_all(extract, pages), references)
+    report('chain', *extract_all(extract_main_content, pages), references)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmarks indexing throughput and query latency of the inverted index on a
+synthetic corpus with a Zipf-distributed vocabulary.
+
+Usage:
+    python benchmarks/bench_indexer.py --docs 1000000 --doc-length 200
+"""
+import argparse
+import itertools
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crawler'))
+
+from indexer import InvertedIndex
+
+
+def make_vocabulary(size):
+    rng = random.Random(0)
+    letters = 'abcdefghijklmnopqrstuvwxyzابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی'
+    return [''.join(rng.choices(letters, k=rng.randint(3, 10))) + str(idx) for idx in range(size)]
+
+
+def generate_documents(count, doc_length, vocabulary, seed=1):
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    for doc_id in range(count):
+        yield {'url': f'https://example.com/article/{doc_id}',
+               'content': ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=doc_length))}
+
+
+def time_queries(run_query, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        run_query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[int(len(latencies) * 0.5)], latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the inverted index.')
+    parser.add_argument('--docs', type=int, default=1000000, help='Number of documents to index')
+    parser.add_argument('--doc-length', type=int, default=200, help='Terms per document')
+    parser.add_argument('--vocabulary', type=int, default=100000, help='Vocabulary size')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries to time')
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary(args.vocabulary)
+    index_dir = tempfile.mkdtemp(prefix='pycrawl_index_')
+    try:
+        start = time.perf_counter()
+        with InvertedIndex(index_dir) as index:
+            index.add_documents(generate_documents(args.docs, args.doc_length, vocabulary))
+        elapsed = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir)) / 2 ** 20
+        print(f"Indexed {args.docs} documents in {elapsed:.1f}s ({args.docs / elapsed:.0f} docs/s, "
+              f"{args.docs * args.doc_length / elapsed:.0f} terms/s), index size {size_mb:.1f} MB")
+        # ru_maxrss is in kilobytes on Linux
+        print(f"Peak memory while indexing: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+        rng = random.Random(2)
+        # Mix of frequent and rare terms, as in real queries
+        queries = [' '.join(rng.choice(vocabulary[:1000] if rng.random() < 0.5 else vocabulary)
+                            for _ in range(rng.randint(1, 3))) for _ in range(args.queries)]
+        with InvertedIndex(index_dir) as index:
+            print(f"Opened index with {len(index.segments)} segments")
+            for name, run_query in (('BM25', index.search), ('boolean', index.boolean_search)):
+                mean, p50, p95 = time_queries(run_query, queries)
+                print(f"{name} query latency: mean {mean:.1f} ms, p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+    finally:
+        shutil.rmtree(index_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,8 @@ LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 MAX_RETRIES = 5
+# Status codes worth retrying later, any other error status is treated as permanent
+RETRYABLE_STATUS_CODES = {403, 429, 500, 502, 503, 504}
 TIMEOUT = 15
 MIN_DELAY = 2
 # Starting depth for the crawler
@@ -26,3 +28,57 @@ MAX_DEPTH = 3
 MAX_DELAY = 30
 
 MAX_CRAWL_COUNT=-1
+
+# URL classifier: skip URLs that are unlikely to be articles before fetching them
+URL_SKIP_THRESHOLD = 0.2  # Skip a URL when its predicted article probability falls below this
+URL_MIN_OBSERVATIONS = 20  # Number of extraction outcomes to learn from before skipping anything
+URL_MIN_FEATURE_SUPPORT = 5  # A URL is only skipped if one of its features was seen at least this often
+# Regexes (matched against the URL path) that are never articles on any site
+DEFAULT_URL_EXCLUDE_PATTERNS = [
+    r'/(login|signin|sign-in|register|signup|sign-up|logout|search)(/|$)',
+    r'/(feed|rss)(/|$)',
+    r'\.(jpe?g|png|gif|svg|webp|pdf|zip|mp3|mp4|css|js)$',
+]
+# Per-site include/exclude regexes, keyed by netloc. Include patterns always get fetched,
+# exclude patterns are never fetched.
+URL_PATTERNS = {
+    # 'www.zeitoons.com': {
+    #     'include': [r'/\d+/'],
+    #     'exclude': [r'/tag/', r'/author/', r'/page/\d+'],
+    # },
+}
+
+# Output format for scraped data: 'json' or 'parquet' (requires pyarrow)
+OUTPUT_FORMAT = 'json'
+PARQUET_ROW_GROUP_SIZE = 10000  # Documents per Parquet row group
+PARQUET_COMPRESSION = 'zstd'  # Column compression codec
+
+# Inverted index over scraped content
+INDEX_ENABLED = False  # Add scraped documents to the index at the end of each crawl
+INDEX_DIR = os.path.join(DATA_DIR, 'index')
+INDEX_FLUSH_DOCS = 10000  # Documents buffered in memory before they are written as a segment
+INDEX_MERGE_FACTOR = 10  # Number of same-sized segments merged into one larger segment
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Per-host circuit breaker: pause a host after consecutive failed requests
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before a host is paused
+CIRCUIT_RESET_TIMEOUT = 60  # Seconds a host stays paused before a probe request is allowed
+CIRCUIT_MAX_RESET_TIMEOUT = 1800  # Upper bound for the pause, which doubles after every failed probe
+
+# Content extractor backends ('rules', 'density', 'newspaper'), tried in order. The next
+# backend is used when one returns less than EXTRACTOR_MIN_TEXT_LENGTH characters.
+DEFAULT_EXTRACTORS = ['rules', 'density', 'newspaper']
+EXTRACTOR_MIN_TEXT_LENGTH = 200
+# Per-site backend chains, keyed by netloc
+SITE_EXTRACTORS = {
+    # 'www.zeitoons.com': ['rules', 'newspaper'],
+}
+# Per-site rules for the 'rules' backend, keyed by netloc. Selectors starting with '/' or '('
+# are XPath, anything else is CSS (requires the cssselect package).
+EXTRACTOR_RULES = {
+    # 'www.zeitoons.com': {
+    #     'content': 'div.entry-content p',
+    #     'remove': ['div.share-buttons', '//div[@id="comments"]'],
+    # },
+}
@@ -1,25 +1,52 @@
 import logging
-from newspaper import Article
-import nltk
+import re
+from urllib.parse import urlparse
+import lxml.html
+from lxml import etree
+from config import DEFAULT_EXTRACTORS, SITE_EXTRACTORS, EXTRACTOR_RULES, EXTRACTOR_MIN_TEXT_LENGTH
 
-# Ensure necessary NLTK data is downloaded (Natural Language Toolkit library in Python)
-nltk.download('punkt_tab', quiet=True)
+# Elements that never hold article text
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'iframe', 'nav', 'header', 'footer',
+                    'aside', 'button', 'select', 'svg']
+PARAGRAPH_TAGS = ('p', 'pre', 'h2', 'h3', 'h4')
+NEGATIVE_RE = re.compile(r'comment|sidebar|footer|nav|menu|share|social|related|banner|advert|\bads?\b|promo|widget|breadcrumb', re.I)
+POSITIVE_RE = re.compile(r'article|content|entry|post|story|body|text|main|news', re.I)
+MIN_PARAGRAPH_LENGTH = 25
 
-def extract_main_content(html_content, url):
+HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8', remove_comments=True)
+
+# newspaper3k (and the NLTK data it needs) is slow to import, so it is only loaded on first use
+_Article = None
+
+
+def _newspaper_article(url):
+    global _Article
+    if _Article is None:
+        from newspaper import Article
+        import nltk
+
+        # Ensure necessary NLTK data is downloaded (Natural Language Toolkit library in Python)
+        nltk.download('punkt_tab', quiet=True)
+        _Article = Article
+    return _Article(url)
+
+
+def extract_with_newspaper(html_content, url):
     """
     Extracts the main textual content from a webpage using newspaper3k.
 
     Args:
+        html_content (str): The HTML of the page.
         url (str): The URL of the webpage to extract content from.
 
     Returns:
         str: The extracted text content of the page.
     """
     try:
-        article = Article(url)
+        article = _newspaper_article(url)
         article.set_html(html_content)
         article.parse()
-        """ For better performance, these fields should be extracted in a background job(service) for processing scraped data 
+        """ For better performance, these fields should be extracted in a background job(service) for processing scraped data
         article.title
         article.publish_date
         article.authors
@@ -31,17 +58,203 @@ def extract_main_content(html_content, url):
         article.summary """
         return article.text
     except ImportError as ie:
-        logging.error(f"extract_main_content, ImportError: {ie}: {ie}")
+        logging.error(f"extract_with_newspaper, ImportError: {ie}")
+        return ""
     except Exception as e:
         logging.error(f"Failed to extract content from {url}: {e}")
         return ""
-    
+
+
+def _parse_html(html_content, url):
+    try:
+        doc = lxml.html.document_fromstring(html_content.encode('utf-8'), parser=HTML_PARSER)
+    except (etree.ParserError, ValueError) as e:
+        logging.error(f"Failed to parse HTML from {url}: {e}")
+        return None
+    etree.strip_elements(doc, *BOILERPLATE_TAGS, with_tail=False)
+    # ASP.NET WebForms pages wrap the whole body in a <form>, so only forms
+    # without paragraphs (search boxes, login and comment forms) are dropped
+    for form in list(doc.iter('form')):
+        if form.find('.//p') is None:
+            form.drop_tree()
+    return doc
+
+
+def _text(element):
+    return ' '.join(element.text_content().split())
+
+
+def _class_weight(element):
+    weight = 0
+    for attribute in (element.get('class'), element.get('id')):
+        if attribute:
+            if NEGATIVE_RE.search(attribute):
+                weight -= 25
+            if POSITIVE_RE.search(attribute):
+                weight += 25
+    return weight
+
+
+def _link_density(element):
+    text_length = len(element.text_content())
+    if not text_length:
+        return 0
+    return sum(len(link.text_content()) for link in element.iter('a')) / text_length
+
+
+def _paragraphs(element):
+    """
+    Collects the paragraph texts under an element, skipping link lists and
+    boilerplate blocks (share buttons, related links, ...) nested inside it.
+    """
+    paragraphs = []
+    for paragraph in element.iter(*PARAGRAPH_TAGS):
+        text = _text(paragraph)
+        if not text or _link_density(paragraph) > 0.5:
+            continue
+        ancestor = paragraph.getparent()
+        while ancestor is not None and ancestor is not element and _class_weight(ancestor) >= 0:
+            ancestor = ancestor.getparent()
+        if ancestor is not None and ancestor is not element:
+            continue
+        paragraphs.append(text)
+    return paragraphs
+
+
+def extract_with_density(html_content, url):
+    """
+    Extracts the main text with a lightweight text-density heuristic: boilerplate
+    elements are removed, every paragraph scores its parent (and half its grandparent)
+    by length and punctuation, and the paragraphs of the best-scoring container with
+    a low link density are returned.
+
+    Args:
+        html_content (str): The HTML of the page.
+        url (str): The URL of the page.
+
+    Returns:
+        str: The extracted text, paragraphs separated by blank lines.
+    """
+    doc = _parse_html(html_content, url)
+    if doc is None:
+        return ""
+
+    scores = {}
+    for paragraph in doc.iter('p', 'pre'):
+        text = _text(paragraph)
+        if len(text) < MIN_PARAGRAPH_LENGTH:
+            continue
+        # Commas (Latin and Persian) are a good sign of prose
+        score = 1 + text.count(',') + text.count('،') + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for container, share in ((parent, 1), (grandparent, 0.5)):
+            if container is None:
+                continue
+            if container not in scores:
+                scores[container] = _class_weight(container)
+            scores[container] += score * share
+
+    if not scores:
+        return ""
+    best = max(scores, key=lambda container: scores[container] * (1 - _link_density(container)))
+    return '\n\n'.join(_paragraphs(best))
+
+
+def _select(doc, selector):
+    if selector.startswith(('/', '(')):
+        return doc.xpath(selector)
+    # Needs the optional cssselect package
+    return doc.cssselect(selector)
+
+
+def extract_with_rules(html_content, url, rules=None):
+    """
+    Extracts the main text with per-site CSS/XPath rules from EXTRACTOR_RULES.
+
+    A rule set has a 'content' selector for the article body and an optional
+    'remove' list of selectors for elements dropped before extraction.
+
+    Args:
+        html_content (str): The HTML of the page.
+        url (str): The URL of the page.
+        rules (dict): The rules to use, defaults to those configured for the URL's site.
+
+    Returns:
+        str: The extracted text, or an empty string if the site has no rules.
+    """
+    rules = rules or EXTRACTOR_RULES.get(urlparse(url).netloc)
+    if not rules:
+        return ""
+    doc = _parse_html(html_content, url)
+    if doc is None:
+        return ""
+    try:
+        for selector in rules.get('remove', []):
+            for element in _select(doc, selector):
+                element.drop_tree()
+        parts = []
+        for element in _select(doc, rules['content']):
+            # XPath expressions may select text nodes directly
+            if isinstance(element, str):
+                parts.append(' '.join(element.split()))
+            else:
+                parts.extend(_paragraphs(element) or [_text(element)])
+    except Exception as e:
+        logging.error(f"Failed to apply extractor rules to {url}: {e}")
+        return ""
+    return '\n\n'.join(part for part in parts if part)
+
+
+EXTRACTORS = {
+    'rules': extract_with_rules,
+    'density': extract_with_density,
+    'newspaper': extract_with_newspaper,
+}
+
+
+def get_site_extractors(url):
+    """
+    Returns the names of the extractor backends configured for the URL's site.
+    """
+    return SITE_EXTRACTORS.get(urlparse(url).netloc, DEFAULT_EXTRACTORS)
+
+
+def extract_main_content(html_content, url, extractors=None, min_length=EXTRACTOR_MIN_TEXT_LENGTH):
+    """
+    Extracts the main textual content from a webpage.
+
+    The site's extractor backends are tried in order; when one returns less than
+    min_length characters the next one is tried. Short text is usually an excerpt or
+    boilerplate rather than the article, so nothing is returned if no backend
+    reaches min_length.
+
+    Args:
+        html_content (str): The HTML of the page.
+        url (str): The URL of the webpage to extract content from.
+        extractors (list): Backend names to try, defaults to the site's configured chain.
+        min_length (int): Minimum text length accepted from a backend.
+
+    Returns:
+        str: The extracted text content of the page, or an empty string if no article text was found.
+    """
+    for name in extractors or get_site_extractors(url):
+        text = EXTRACTORS[name](html_content, url) or ""
+        if len(text) >= min_length:
+            logging.debug(f"Extracted {len(text)} characters from {url} with the {name} extractor")
+            return text
+    logging.debug(f"No extractor returned {min_length} characters of text from {url}")
+    return ""
+
+
 def download_and_extract_main_content(url):
+    from requester import make_request
+
     try:
-        article = Article(url)
-        article.download()
-        article.parse()
-        return article.text
+        response = make_request(url)
+        if response.encoding is None:
+            response.encoding = 'utf-8' # Fallback encoding
+        return extract_main_content(response.text, url)
     except Exception as e:
         logging.error(f"Failed to extract content from {url}: {e}")
         return ""
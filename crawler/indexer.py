@@ -0,0 +1,521 @@
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import math
+import mmap
+import os
+import re
+from collections import Counter, defaultdict
+from config import INDEX_DIR, INDEX_FLUSH_DOCS, INDEX_MERGE_FACTOR, BM25_K1, BM25_B
+
+# Map Arabic letter variants and digits to their Persian/ASCII forms, and drop
+# tatweel and zero-width non-joiner so both spellings of a word match
+CHARACTER_MAP = {
+    'ي': 'ی',
+    'ى': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'ۀ': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    '\u0640': '',  # tatweel
+    '\u200c': '',  # zero-width non-joiner
+    **{chr(0x06f0 + i): str(i) for i in range(10)},  # Persian digits
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic-Indic digits
+    # Diacritics (harakat, superscript alef)
+    **{chr(code): '' for code in range(0x064b, 0x0660)},
+    '\u0670': '',
+}
+# str.translate is slow on non-ASCII text, so only the characters to replace are matched
+CHARACTER_RE = re.compile('[' + ''.join(CHARACTER_MAP) + ']')
+TOKEN_RE = re.compile(r'\w+')
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def normalize_text(text):
+    """
+    Normalizes text for indexing: unifies Persian/Arabic letter variants and digits,
+    removes diacritics and lowercases Latin text.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return CHARACTER_RE.sub(lambda match: CHARACTER_MAP[match.group()], text).lower()
+
+
+def tokenize(text):
+    """
+    Splits text into normalized terms.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list: The terms in the text.
+    """
+    return TOKEN_RE.findall(normalize_text(text))
+
+
+def content_hash(content):
+    """
+    Returns a short fingerprint of a document's text, used to detect changed content.
+    """
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def encode_postings(postings):
+    """
+    Compresses a posting list as varint-encoded doc id gaps followed by term frequencies.
+
+    Args:
+        postings (list): (doc_id, term_frequency) pairs sorted by doc_id.
+
+    Returns:
+        bytes: The encoded posting list.
+    """
+    out = bytearray()
+    previous = 0
+    for doc_id, tf in postings:
+        for value in (doc_id - previous, tf):
+            while value >= 0x80:
+                out.append((value & 0x7f) | 0x80)
+                value >>= 7
+            out.append(value)
+        previous = doc_id
+    return bytes(out)
+
+
+def decode_postings(data):
+    """
+    Decodes a posting list produced by encode_postings.
+
+    Args:
+        data (bytes): The encoded posting list.
+
+    Returns:
+        list: (doc_id, term_frequency) pairs sorted by doc_id.
+    """
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    postings = []
+    doc_id = 0
+    for idx in range(0, len(values), 2):
+        doc_id += values[idx]
+        postings.append((doc_id, values[idx + 1]))
+    return postings
+
+
+class Segment:
+    """
+    An immutable on-disk segment: a postings file, a JSON file with the term
+    dictionary (term -> offset, length, document frequency) and a JSON file with
+    the segment's documents. The documents are only read when needed, since the
+    index keeps its own table of all documents.
+    """
+
+    def __init__(self, index_dir, name):
+        self.name = name
+        self.postings_path = os.path.join(index_dir, f"{name}.post")
+        self.meta_path = os.path.join(index_dir, f"{name}.meta.json")
+        self.docs_path = os.path.join(index_dir, f"{name}.docs.json")
+        with open(self.meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        self.terms = meta['terms']
+        self._file = open(self.postings_path, 'rb')
+        # An empty file cannot be memory-mapped
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(self.postings_path) else b''
+
+    @classmethod
+    def write(cls, index_dir, name, term_postings, docs):
+        """
+        Writes a new segment to disk, streaming postings one term at a time.
+
+        Args:
+            index_dir (str): The index directory.
+            name (str): The segment name.
+            term_postings (iterable): (term, postings) pairs in sorted term order, where
+                postings is a list of (doc_id, term_frequency) pairs.
+            docs (list): [doc_id, url, length, content_hash] entries for the segment's documents.
+
+        Returns:
+            Segment: The written segment.
+        """
+        terms = {}
+        offset = 0
+        with open(os.path.join(index_dir, f"{name}.post"), 'wb') as file:
+            for term, postings in term_postings:
+                data = encode_postings(postings)
+                file.write(data)
+                terms[term] = [offset, len(data), len(postings)]
+                offset += len(data)
+        with open(os.path.join(index_dir, f"{name}.meta.json"), 'w', encoding='utf-8') as file:
+            json.dump({'terms': terms}, file, ensure_ascii=False)
+        with open(os.path.join(index_dir, f"{name}.docs.json"), 'w', encoding='utf-8') as file:
+            json.dump(docs, file, ensure_ascii=False)
+        return cls(index_dir, name)
+
+    def read_docs(self):
+        """
+        Reads the segment's documents from disk.
+
+        Returns:
+            list: [doc_id, url, length, content_hash] entries for the segment's documents.
+        """
+        with open(self.docs_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def postings(self, term):
+        entry = self.terms.get(term)
+        if entry is None:
+            return []
+        offset, length, _ = entry
+        return decode_postings(self._data[offset:offset + length])
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def delete(self):
+        self.close()
+        os.remove(self.postings_path)
+        os.remove(self.meta_path)
+        os.remove(self.docs_path)
+
+
+class InvertedIndex:
+    """
+    Incremental on-disk inverted index over scraped documents.
+
+    New documents are buffered in memory and flushed as immutable segments. Once
+    INDEX_MERGE_FACTOR segments of the same level exist they are merged into one
+    segment of the next level, so the number of segments stays logarithmic in the
+    number of documents. Doc ids only grow, so merging preserves posting order.
+
+    Re-adding a URL with changed content indexes it under a new doc id and records
+    the old doc id as deleted; deleted documents are filtered out of query results
+    and dropped when their segment is merged.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR, flush_docs=INDEX_FLUSH_DOCS, merge_factor=INDEX_MERGE_FACTOR):
+        self.index_dir = index_dir
+        self.flush_docs = flush_docs
+        self.merge_factor = merge_factor
+        os.makedirs(index_dir, exist_ok=True)
+
+        manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        else:
+            manifest = {'next_doc_id': 0, 'next_segment_id': 0, 'segments': [], 'deleted': []}
+        self.next_doc_id = manifest['next_doc_id']
+        # Replaced doc ids still present in segment postings
+        self.deleted = set(manifest.get('deleted', []))
+        self.next_segment_id = manifest['next_segment_id']
+        self.levels = {entry['name']: entry['level'] for entry in manifest['segments']}
+        self.segments = [Segment(index_dir, entry['name']) for entry in manifest['segments']]
+
+        # doc_id -> (url, length, content_hash) for every live document
+        self.docs = {}
+        for segment in self.segments:
+            for doc_id, url, length, doc_hash in segment.read_docs():
+                if doc_id not in self.deleted:
+                    self.docs[doc_id] = (url, length, doc_hash)
+        # url -> doc_id of its current version
+        self.urls = {url: doc_id for doc_id, (url, _, _) in self.docs.items()}
+        self.total_length = sum(length for _, length, _ in self.docs.values())
+
+        self._buffer = defaultdict(list)
+        self._buffer_docs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add_document(self, url, content):
+        """
+        Adds a document to the index. If the URL is already indexed with the same
+        content the document is skipped, otherwise the old version is replaced.
+
+        Args:
+            url (str): The document URL.
+            content (str): The document text.
+
+        Returns:
+            int: The new doc id, or None if the URL is already indexed with this content.
+        """
+        doc_hash = content_hash(content)
+        old_doc_id = self.urls.get(url)
+        if old_doc_id is not None:
+            if self.docs[old_doc_id][2] == doc_hash:
+                return None
+            self._delete(old_doc_id)
+        doc_id = self.next_doc_id
+        self.next_doc_id += 1
+        terms = tokenize(content)
+        for term, tf in Counter(terms).items():
+            self._buffer[term].append((doc_id, tf))
+        self._buffer_docs.append([doc_id, url, len(terms), doc_hash])
+        self.docs[doc_id] = (url, len(terms), doc_hash)
+        self.urls[url] = doc_id
+        self.total_length += len(terms)
+        if len(self._buffer_docs) >= self.flush_docs:
+            self.flush()
+        return doc_id
+
+    def add_documents(self, documents):
+        """
+        Adds scraped documents ({'url': ..., 'content': ...} dictionaries) to the index.
+
+        Args:
+            documents (iterable): The documents to add.
+
+        Returns:
+            int: The number of new or updated documents.
+        """
+        added = 0
+        for doc in documents:
+            if doc and self.add_document(doc['url'], doc['content']) is not None:
+                added += 1
+        return added
+
+    def _delete(self, doc_id):
+        url, length, _ = self.docs.pop(doc_id)
+        del self.urls[url]
+        self.total_length -= length
+        self.deleted.add(doc_id)
+
+    def flush(self):
+        """
+        Writes buffered documents to a new segment and merges segments if needed.
+        """
+        if not self._buffer_docs:
+            return
+        segment = Segment.write(self.index_dir, self._new_segment_name(), sorted(self._buffer.items()), self._buffer_docs)
+        self.segments.append(segment)
+        self.levels[segment.name] = 0
+        self._buffer = defaultdict(list)
+        self._buffer_docs = []
+        self._merge_segments()
+        self._write_manifest()
+
+    def close(self):
+        """
+        Flushes buffered documents and releases the segment files.
+        """
+        self.flush()
+        for segment in self.segments:
+            segment.close()
+
+    def _new_segment_name(self):
+        name = f"segment_{self.next_segment_id:06d}"
+        self.next_segment_id += 1
+        return name
+
+    def _merge_segments(self):
+        while len(self.segments) >= self.merge_factor:
+            tail = self.segments[-self.merge_factor:]
+            level = self.levels[tail[0].name]
+            if any(self.levels[segment.name] != level for segment in tail):
+                break
+            docs = [doc for segment in tail for doc in segment.read_docs()]
+            # Replaced documents are dropped from the merged segment
+            dropped = {doc[0] for doc in docs} & self.deleted
+            docs = [doc for doc in docs if doc[0] not in dropped]
+            merged = Segment.write(self.index_dir, self._new_segment_name(),
+                                   self._merged_postings(tail, dropped), docs)
+            logging.info(f"Merged {len(tail)} index segments into {merged.name} ({len(docs)} documents)")
+            # Record the merged segment before deleting its inputs
+            self.segments = self.segments[:-self.merge_factor] + [merged]
+            self.levels[merged.name] = level + 1
+            self.deleted -= dropped
+            self._write_manifest()
+            for segment in tail:
+                del self.levels[segment.name]
+                segment.delete()
+
+    @staticmethod
+    def _merged_postings(segments, deleted=frozenset()):
+        """
+        Yields (term, postings) for the union of the segments' terms in sorted order,
+        with a k-way merge over the segment term lists so only one term's postings
+        are held in memory at a time. Postings of deleted doc ids are left out.
+        """
+        # Tag each term with its segment's position so postings stay in doc id order
+        term_lists = [zip(sorted(segment.terms), itertools.repeat(position))
+                      for position, segment in enumerate(segments)]
+        for term, entries in itertools.groupby(heapq.merge(*term_lists), key=lambda entry: entry[0]):
+            postings = []
+            for _, position in entries:
+                postings.extend(segments[position].postings(term))
+            if deleted:
+                postings = [posting for posting in postings if posting[0] not in deleted]
+            if postings:
+                yield term, postings
+
+    def _write_manifest(self):
+        manifest = {
+            'next_doc_id': self.next_doc_id,
+            'next_segment_id': self.next_segment_id,
+            'segments': [{'name': segment.name, 'level': self.levels[segment.name]} for segment in self.segments],
+            'deleted': sorted(self.deleted),
+        }
+        manifest_path = os.path.join(self.index_dir, MANIFEST_FILE)
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+        os.replace(tmp_path, manifest_path)
+
+    def postings(self, term):
+        """
+        Returns the (doc_id, term_frequency) pairs for a normalized term across all
+        segments, leaving out deleted documents.
+        """
+        postings = []
+        for segment in self.segments:
+            postings.extend(segment.postings(term))
+        postings.extend(self._buffer.get(term, []))
+        if self.deleted:
+            postings = [posting for posting in postings if posting[0] not in self.deleted]
+        return postings
+
+    def boolean_search(self, query):
+        """
+        Finds the documents matching a boolean query.
+
+        Terms are ANDed by default (an explicit 'AND' is also accepted), 'OR'
+        separates alternatives and a leading '-' or 'NOT' excludes a term,
+        e.g. 'tehran OR shiraz -weather'.
+
+        Args:
+            query (str): The boolean query.
+
+        Returns:
+            list: The URLs of the matching documents, in index order.
+        """
+        matches = set()
+        for clause in re.split(r'\s+OR\s+', query.strip()):
+            required, excluded = [], []
+            negate = False
+            for word in clause.split():
+                if word == 'AND':
+                    continue
+                if word == 'NOT':
+                    negate = True
+                    continue
+                if word.startswith('-'):
+                    negate, word = True, word[1:]
+                (excluded if negate else required).extend(tokenize(word))
+                negate = False
+            if not required:
+                continue
+            # Intersect the shortest posting lists first
+            doc_sets = sorted(({doc_id for doc_id, _ in self.postings(term)} for term in required), key=len)
+            clause_docs = set.intersection(*doc_sets)
+            for term in excluded:
+                clause_docs.difference_update(doc_id for doc_id, _ in self.postings(term))
+            matches |= clause_docs
+        return [self.docs[doc_id][0] for doc_id in sorted(matches)]
+
+    def search(self, query, limit=10, k1=BM25_K1, b=BM25_B):
+        """
+        Ranks documents against a free-text query with BM25.
+
+        Args:
+            query (str): The query text.
+            limit (int): The maximum number of results.
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 length normalization.
+
+        Returns:
+            list: (score, url) tuples, best match first.
+        """
+        doc_count = len(self.docs)
+        if not doc_count:
+            return []
+        avg_length = self.total_length / doc_count or 1
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings:
+                length = self.docs[doc_id][1]
+                scores[doc_id] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, self.docs[doc_id][0]) for doc_id, score in best]
+
+
+def update_index(documents, index_dir=INDEX_DIR):
+    """
+    Adds scraped documents to the on-disk index. Already indexed URLs are skipped
+    unless their content changed, in which case the indexed version is replaced.
+
+    Args:
+        documents (list): The scraped documents.
+        index_dir (str): The index directory.
+    """
+    with InvertedIndex(index_dir) as index:
+        added = index.add_documents(documents)
+        logging.info(f"Indexed {added} new documents ({len(index)} in total) in {index_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index and search scraped content.')
+    parser.add_argument('--index-dir', default=INDEX_DIR, help='Index directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = subparsers.add_parser('add', help='Add a scraped .json or .parquet output file to the index '
+                                                   '(re-crawled pages with changed content replace their old version)')
+    add_parser.add_argument('path')
+
+    search_parser = subparsers.add_parser('search', help='Search the index')
+    search_parser.add_argument('query')
+    search_parser.add_argument('-n', '--limit', type=int, default=10, help='Maximum number of results')
+    search_parser.add_argument('--boolean', action='store_true', help='Treat the query as a boolean query')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == 'add':
+        from utils import load_json, load_parquet
+        documents = load_parquet(args.path, columns=['url', 'content']) if args.path.endswith('.parquet') else load_json(args.path)
+        update_index(documents, args.index_dir)
+        return
+
+    with InvertedIndex(args.index_dir) as index:
+        if args.boolean:
+            results = index.boolean_search(args.query)
+            for url in results[:args.limit]:
+                print(url)
+            print(f"\n{len(results)} matching documents")
+        else:
+            for score, url in index.search(args.query, limit=args.limit):
+                print(f"{score:.3f}\t{url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 from urllib.parse import urlparse
-from config import DEFAULT_USER_AGENT, MAX_CRAWL_COUNT
+from config import DEFAULT_USER_AGENT, MAX_CRAWL_COUNT, INDEX_ENABLED
 from robots_sitemaps_parser import fetch_and_parse_robots_txt, fetch_and_parse_sitemaps
 from scraper import crawl_website, scrape_url
-from utils import setup_logging, create_directories, get_timestamp, save_json
+from url_classifier import URLClassifier
+from retry_queue import RetryQueue, CircuitBreaker
+from indexer import update_index
+from utils import setup_logging, create_directories, get_timestamp, save_output
 import logging
 import signal
+import time
 
 visited = set()  # Keep track of visited URLs
 articles = []  # Store crawled articles' content
@@ -15,7 +19,8 @@ start_url = "https://www.zeitoons.com/"
 def signal_handler(sig, frame):
     print("\n\nCtrl+C detected. Stopping the crawl process...")
     logging.info(f"Total documents scraped: {len(articles)}")
-    save_json(articles, start_url=start_url)
+    # Save and index what was scraped so far, like a finished crawl
+    finalProcessing(articles)
     exit(0)
 
 # Register the signal handler for Ctrl+C (SIGINT)
@@ -51,15 +56,40 @@ def main():
 
     # Fetch and parse sitemaps to get URLs to crawl
     urls_to_crawl = fetch_and_parse_sitemaps(sitemap_urls)
+    # Learns from extraction outcomes which URLs are not worth fetching
+    url_classifier = URLClassifier.for_site(start_url)
+
+    # Failed fetches are retried later instead of blocking the crawl
+    retry_queue = RetryQueue()
+    circuit_breaker = CircuitBreaker()
+
+    def scrape(url, attempt=0):
+        doc = scrape_url(url, retry_queue=retry_queue, circuit_breaker=circuit_breaker, attempt=attempt,
+                         url_classifier=url_classifier)
+        if doc:
+            articles.append(doc)
 
     # Crawl the URLs
     for url in urls_to_crawl:
+        # Skip URLs the classifier has learned are unlikely to be articles
+        if not url_classifier.should_fetch(url):
+            continue
         # Check if URL is allowed by robots.txt
         if rp is None or rp.can_fetch(DEFAULT_USER_AGENT, url) and url not in visited and (crawl_count <= MAX_CRAWL_COUNT or MAX_CRAWL_COUNT == -1):
-            doc = scrape_url(url)
+            scrape(url)
             visited.add(url)
             crawl_count += 1
-            articles.append(doc)
+        for retry_url, attempt, _ in retry_queue.pop_due():
+            scrape(retry_url, attempt)
+
+    # Only wait for deferred URLs once there is nothing else left to crawl
+    while retry_queue:
+        wait_time = retry_queue.time_until_next()
+        if wait_time:
+            logging.info(f"{len(retry_queue)} URLs waiting to be retried. Next retry in {wait_time:.0f} seconds.")
+            time.sleep(wait_time)
+        for retry_url, attempt, _ in retry_queue.pop_due():
+            scrape(retry_url, attempt)
 
     logging.info(f"Total documents scraped: {len(articles)}")
 
@@ -71,7 +101,10 @@ def finalProcessing(articles):
         logging.error("No articles were scraped. Exiting.")
         return
     
-    save_json(articles, start_url)
+    save_output(articles, start_url)
+
+    if INDEX_ENABLED:
+        update_index(articles)
 
     
 
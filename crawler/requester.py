@@ -3,16 +3,80 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
 import logging
-from config import MAX_RETRIES, TIMEOUT, MIN_DELAY, MAX_DELAY, headers
+from config import MAX_RETRIES, RETRYABLE_STATUS_CODES, TIMEOUT, MIN_DELAY, MAX_DELAY, headers
 from requests.exceptions import RequestException, HTTPError
 from email.utils import parsedate_to_datetime
-from datetime import datetime
+from datetime import datetime, timezone
+
+
+class RetryableRequestError(RequestException):
+    """
+    Raised when a request failed in a way that is worth retrying later
+    (connection errors and the status codes in RETRYABLE_STATUS_CODES).
+
+    Attributes:
+        retry_after (str): The Retry-After header of the response, if any.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt, retry_after=None, delay=MIN_DELAY):
+    """
+    Computes how long to wait before the next attempt.
+
+    Args:
+        attempt (int): The number of attempts made so far.
+        retry_after (str): The Retry-After header value (seconds or an HTTP-date), if any.
+        delay (float): The base delay.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    if retry_after:
+        return parse_retry_after(retry_after, delay, attempt)
+    return delay * 2 ** (attempt - 1)
+
+
+def fetch_once(url, headers=headers):
+    """
+    Makes a single HTTP GET request without retrying.
+
+    Args:
+        url (str): The URL to request.
+        headers (dict): HTTP headers to include in the request.
+
+    Returns:
+        requests.Response: The HTTP response object.
+
+    Raises:
+        RetryableRequestError: If the request failed but may succeed later.
+        HTTPError: If the request failed permanently (404, 410 and other client errors).
+    """
+    try:
+        response = requests.get(url, headers=headers, timeout=TIMEOUT)
+    except RequestException as e:
+        raise RetryableRequestError(f"Request failed for {url}: {e}") from e
+    status_code = response.status_code
+    if status_code == 200:
+        return response
+    if status_code in RETRYABLE_STATUS_CODES:
+        # Handle Too Many Requests, Service Unavailable, Forbidden and server errors
+        logging.warning(f"Received status code {status_code} for {url}")
+        raise RetryableRequestError(f"Received status code {status_code} for {url}",
+                                    retry_after=response.headers.get('Retry-After'))
+    logging.error(f"Request failed for {url}: status_code: {status_code}")
+    raise HTTPError(f"Failed to retrieve {url}: status_code: {status_code}")
 
 
 def make_request(url, headers=headers, max_retries=MAX_RETRIES):
     """
     Makes an HTTP GET request with error handling and retries.
 
+    This blocks while waiting between retries; the crawler uses fetch_or_defer instead.
+
     Args:
         url (str): The URL to request.
         headers (dict): HTTP headers to include in the request.
@@ -24,43 +88,66 @@ def make_request(url, headers=headers, max_retries=MAX_RETRIES):
     Raises:
         HTTPError: If the request fails after the maximum number of retries.
     """
-    delay = MIN_DELAY
-    logging.info(f"make_request {url} delay { delay }.")
+    logging.info(f"make_request {url} delay { MIN_DELAY }.")
     for attempt in range(1, max_retries + 1):
         try:
-            response = requests.get(url, headers=headers, timeout=TIMEOUT)
-            status_code = response.status_code
-            if status_code == 200:
-                return response
-            elif status_code in [429, 503, 403]:
-                # Handle Too Many Requests, Service Unavailable, Forbidden
-                logging.warning(f"Received status code {status_code} for {url}")
-                retry_after = response.headers.get('Retry-After')
-                if retry_after:
-                    try:
-                        wait_time = int(retry_after)
-                    except ValueError:
-                        wait_time = delay * 2 ** (attempt - 1)
-                    logging.info(f"Retry-After header found. Waiting for {wait_time} seconds.")
-                    time.sleep(wait_time)
-                else:
-                    wait_time = delay * 2 ** (attempt - 1)
-                    logging.info(f"No Retry-After header. Waiting for {wait_time} seconds before retrying.")
-                    time.sleep(wait_time)
-            elif status_code == 404:
-                logging.error(f"Request failed for {url}: status_code: {status_code}")
-                max_retries = 1
+            return fetch_once(url, headers=headers)
+        except RetryableRequestError as e:
+            logging.error(str(e))
+            if attempt == max_retries:
                 break
-            else:
-                # For other status codes, raise an error
-                response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Request failed for {url}: {e}")
-            wait_time = delay * 2 ** (attempt - 1)
+            wait_time = backoff_delay(attempt, e.retry_after)
             logging.info(f"Waiting for {wait_time} seconds before retrying.")
             time.sleep(wait_time)
     raise requests.exceptions.HTTPError(f"Failed to retrieve {url} after {max_retries} attempts")
 
+
+def fetch_or_defer(url, retry_queue, circuit_breaker, attempt=0, context=None, headers=headers, max_retries=MAX_RETRIES):
+    """
+    Fetches a URL without waiting on failures: URLs of paused hosts and failed
+    requests are pushed to the retry queue and None is returned, so the crawler
+    can move on to other URLs.
+
+    Args:
+        url (str): The URL to request.
+        retry_queue (RetryQueue): Queue receiving deferred URLs.
+        circuit_breaker (CircuitBreaker): Per-host circuit breaker.
+        attempt (int): Number of attempts already made for the URL.
+        context: Caller data stored with a deferred URL (e.g. the crawl depth).
+        headers (dict): HTTP headers to include in the request.
+        max_retries (int): Maximum number of attempts before giving up on the URL.
+
+    Returns:
+        requests.Response: The HTTP response, or None if the URL was deferred or failed too many times.
+
+    Raises:
+        HTTPError: If the request failed permanently (404, 410 and other client errors).
+    """
+    host = urlparse(url).netloc
+    if not circuit_breaker.allow(host):
+        # Waiting for a paused host does not count as an attempt
+        retry_queue.push(url, circuit_breaker.retry_time(host), attempt, context)
+        logging.info(f"Host {host} is paused. Deferring {url}.")
+        return None
+    try:
+        response = fetch_once(url, headers=headers)
+    except RetryableRequestError as e:
+        circuit_breaker.record_failure(host)
+        attempt += 1
+        if attempt >= max_retries:
+            logging.error(f"Failed to retrieve {url} after {attempt} attempts")
+            return None
+        wait_time = backoff_delay(attempt, e.retry_after)
+        retry_queue.push(url, time.monotonic() + wait_time, attempt, context)
+        logging.info(f"Deferring {url} for {wait_time} seconds (attempt {attempt} of {max_retries}).")
+        return None
+    except HTTPError:
+        # The host answered, so it is healthy even though the page is unavailable
+        circuit_breaker.record_success(host)
+        raise
+    circuit_breaker.record_success(host)
+    return response
+
 def parse_retry_after(retry_after, delay, attempt):
     """
     Parses the Retry-After header to determine how long to wait before retrying.
@@ -78,34 +165,58 @@ def parse_retry_after(retry_after, delay, attempt):
         wait_time = int(retry_after)
     except ValueError:
         # Parse HTTP-date
-        retry_after_date = parsedate_to_datetime(retry_after)
-        wait_time = (retry_after_date - datetime.now(datetime.timezone.utc)).total_seconds()
+        try:
+            retry_after_date = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            logging.warning(f"Could not parse Retry-After header: {retry_after}")
+            return delay * 2 ** (attempt - 1)
+        if retry_after_date.tzinfo is None:
+            # HTTP-dates are always in GMT
+            retry_after_date = retry_after_date.replace(tzinfo=timezone.utc)
+        wait_time = (retry_after_date - datetime.now(timezone.utc)).total_seconds()
         if wait_time < 0:
             wait_time = delay * 2 ** (attempt - 1)
     return wait_time
 
-def find_article_links(url, visited, delay):
-    
+def find_article_links(url, visited, delay, url_classifier=None, html_content=None):
+    """
+    Fetches a page and collects the same-host links on it that have not been visited yet.
+
+    Args:
+        url (str): The page to collect links from.
+        visited (set): Set of already visited URLs.
+        delay (float): The current delay between requests in seconds.
+        url_classifier (URLClassifier): Optional classifier used to skip links that are
+            unlikely to be articles and to order the rest by article probability.
+        html_content (str): The page HTML if it was already fetched; the page is
+            only requested when this is None.
+
+    Returns:
+        tuple: A list of links to crawl and the adjusted delay.
+    """
     # Fetch page to extract links
-    try:
-        # Send a GET request to the URL 
-        # The script will wait longer for responses (15 seconds) and can handle timeouts gracefully.
-        response = make_request(url, headers=headers)
-        # Reduce delay after successful request, minimum delay of 1 second
-        delay = max(1, delay / 2)
-    except requests.exceptions.HTTPError as e:
-        logging.error(f"Failed to retrieve {url}: {e}")
-        # Increase delay after failed request
-        delay = min(MAX_DELAY, delay * 2)
-        return [], delay
+    if html_content is None:
+        try:
+            # Send a GET request to the URL 
+            # The script will wait longer for responses (15 seconds) and can handle timeouts gracefully.
+            response = make_request(url, headers=headers)
+        except requests.exceptions.HTTPError as e:
+            logging.error(f"Failed to retrieve {url}: {e}")
+            # Increase delay after failed request
+            delay = min(MAX_DELAY, delay * 2)
+            return [], delay
+        html_content = response.content
+    # Reduce delay after successful request, minimum delay of 1 second
+    delay = max(1, delay / 2)
     
     # Parse the HTML content of the page
-    soup = BeautifulSoup(response.content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'html.parser')
     
     # Find all internal links
     base_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}"
     # Find all article links on the page
     article_links = []
+    seen = set()
     for link_tag in soup.find_all('a', href=True):
         href = link_tag['href']
         if href.startswith('/'):
@@ -116,7 +227,11 @@ def find_article_links(url, visited, delay):
             continue # Skip external links
         # Avoid URL fragments and query parameters for simplicity
         link = link.split('#')[0].split('?')[0]
-        if link not in visited:
+        if link not in visited and link not in seen:
+            seen.add(link)
             article_links.append(link)
-        
+
+    if url_classifier is not None:
+        article_links = url_classifier.prioritize(article_links)
+
     return article_links, delay
\ No newline at end of file
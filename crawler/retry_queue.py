@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import logging
+import time
+from config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, CIRCUIT_MAX_RESET_TIMEOUT
+
+
+class RetryQueue:
+    """
+    Time-ordered queue of deferred fetches, so failed URLs are retried later
+    instead of blocking the crawl while waiting out their backoff.
+    """
+
+    def __init__(self):
+        self._heap = []
+        # Tie-breaker so entries with the same due time keep insertion order
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, url, due_time, attempt, context=None):
+        """
+        Schedules a URL to be fetched again.
+
+        Args:
+            url (str): The URL to retry.
+            due_time (float): time.monotonic() value at which the URL may be retried.
+            attempt (int): Number of attempts already made for the URL.
+            context: Caller data returned with the entry (e.g. the crawl depth).
+        """
+        heapq.heappush(self._heap, (due_time, next(self._counter), url, attempt, context))
+
+    def pop_due(self, now=None):
+        """
+        Removes and returns the entries whose due time has passed.
+
+        Args:
+            now (float): The current time.monotonic() value, defaults to now.
+
+        Returns:
+            list: (url, attempt, context) tuples in due-time order.
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, url, attempt, context = heapq.heappop(self._heap)
+            due.append((url, attempt, context))
+        return due
+
+    def time_until_next(self, now=None):
+        """
+        Returns the seconds until the next entry is due (0 if one is due already),
+        or None if the queue is empty.
+        """
+        if not self._heap:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._heap[0][0] - now)
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    A host is paused (open) after CIRCUIT_FAILURE_THRESHOLD consecutive failures.
+    After CIRCUIT_RESET_TIMEOUT seconds a single probe request is allowed (half-open);
+    the host is resumed if it succeeds and paused again if it fails. The pause doubles
+    after every failed probe, up to CIRCUIT_MAX_RESET_TIMEOUT seconds, so a host that
+    stays down is probed rarely but its URLs are still fetched once it comes back.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT,
+                 max_reset_timeout=CIRCUIT_MAX_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._failures = {}
+        self._reset_timeouts = {}
+        self._state = {}
+        self._opened_at = {}
+
+    def state(self, host):
+        return self._state.get(host, self.CLOSED)
+
+    def current_reset_timeout(self, host):
+        """
+        Returns the seconds the host stays paused, grown by its failed probes.
+        """
+        return self._reset_timeouts.get(host, self.reset_timeout)
+
+    def is_paused(self, host, now=None):
+        """
+        Checks, without sending a probe, whether requests to the host would be refused now.
+
+        Args:
+            host (str): The host (netloc) to check.
+            now (float): The current time.monotonic() value, defaults to now.
+
+        Returns:
+            bool: True if the host is paused.
+        """
+        state = self.state(host)
+        if state == self.CLOSED:
+            return False
+        if state == self.HALF_OPEN:
+            return True
+        now = time.monotonic() if now is None else now
+        return now < self.retry_time(host)
+
+    def allow(self, host, now=None):
+        """
+        Checks whether a request to the host may be made now.
+
+        Args:
+            host (str): The host (netloc) to check.
+            now (float): The current time.monotonic() value, defaults to now.
+
+        Returns:
+            bool: True if the request may be made, False if the host is paused.
+        """
+        if self.is_paused(host, now):
+            return False
+        if self.state(host) == self.OPEN:
+            # The reset timeout has passed, let one probe request through
+            logging.info(f"Circuit half-open for {host}, sending a probe request.")
+            self._state[host] = self.HALF_OPEN
+        return True
+
+    def retry_time(self, host):
+        """
+        Returns the time.monotonic() value at which a paused host may be probed again.
+        """
+        return self._opened_at.get(host, 0) + self.current_reset_timeout(host)
+
+    def record_success(self, host):
+        if self.state(host) != self.CLOSED:
+            logging.info(f"Circuit closed for {host}, resuming requests.")
+        self._state.pop(host, None)
+        self._failures.pop(host, None)
+        self._reset_timeouts.pop(host, None)
+        self._opened_at.pop(host, None)
+
+    def record_failure(self, host, now=None):
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        if self.state(host) == self.HALF_OPEN:
+            # The probe failed, back off further before the next one
+            self._reset_timeouts[host] = min(self.current_reset_timeout(host) * 2, self.max_reset_timeout)
+        if self.state(host) == self.HALF_OPEN or failures >= self.failure_threshold:
+            if self.state(host) != self.OPEN:
+                logging.warning(f"Circuit open for {host} after {failures} consecutive failures. "
+                                f"Pausing requests for {self.current_reset_timeout(host)} seconds.")
+            self._state[host] = self.OPEN
+            self._opened_at[host] = time.monotonic() if now is None else now
@@ -1,7 +1,9 @@
-from config import DEFAULT_USER_AGENT, MAX_DEPTH, MIN_DELAY, MAX_CRAWL_COUNT, headers
-from utils import convert_persian_url, is_persian_character
-from requester import make_request, find_article_links
+from config import DEFAULT_USER_AGENT, MAX_DEPTH, MIN_DELAY, MAX_CRAWL_COUNT, EXTRACTOR_MIN_TEXT_LENGTH, headers
+from utils import convert_persian_url, is_persian_character, make_document
+from requester import make_request, fetch_or_defer, find_article_links
+from retry_queue import RetryQueue, CircuitBreaker
 from extractor import extract_main_content 
+from url_classifier import URLClassifier
 import logging
 import time
 from urllib.parse import urljoin, urlparse
@@ -32,13 +34,32 @@ def is_allowed(url, user_agent='*'):
         # If robots.txt cannot be fetched, assume allowed
         return True
     
-def scrape_url(url, headers=headers, delay=MIN_DELAY):
+def is_article_text(page_text):
+    """
+    Returns True if the extracted text is long enough to be an article. Shorter text
+    usually comes from listing pages (tags, categories, authors) showing an excerpt.
+    """
+    return bool(page_text) and len(page_text) >= EXTRACTOR_MIN_TEXT_LENGTH
+
+def host_paused(url, circuit_breaker):
+    """
+    Returns True if the URL's host is paused by the circuit breaker. Such requests are
+    deferred without being sent, so there is no need to wait politely before them.
+    """
+    return circuit_breaker is not None and circuit_breaker.is_paused(urlparse(url).netloc)
+
+def scrape_url(url, headers=headers, delay=MIN_DELAY, retry_queue=None, circuit_breaker=None, attempt=0, url_classifier=None):
     """
     Scrapes a single URL and extracts its main content.
 
     Args:
         url (str): The URL to scrape.
         headers (dict): HTTP headers to include in the request.
+        retry_queue (RetryQueue): If given, failed requests are deferred to this queue
+            instead of being retried inline. Requires circuit_breaker.
+        circuit_breaker (CircuitBreaker): Per-host circuit breaker used with retry_queue.
+        attempt (int): Number of attempts already made for the URL.
+        url_classifier (URLClassifier): If given, learns from the extraction outcome.
 
     Returns:
         Document: A Document object containing the scraped content, or None if extraction failed.
@@ -51,11 +72,17 @@ def scrape_url(url, headers=headers, delay=MIN_DELAY):
     logging.info(f"Preparing to scrape URL: {url}")
 
     # Respect the delay between requests
-    logging.debug(f"Sleeping for {delay} seconds before making the request to {url}")
-    time.sleep(delay)
+    if not host_paused(url, circuit_breaker):
+        logging.debug(f"Sleeping for {delay} seconds before making the request to {url}")
+        time.sleep(delay)
 
     try:
-        response = make_request(url, headers=headers)
+        if retry_queue is None:
+            response = make_request(url, headers=headers)
+        else:
+            response = fetch_or_defer(url, retry_queue, circuit_breaker, attempt, headers=headers)
+            if response is None:
+                return None
         logging.debug(f"Received response for {url} with status code {response.status_code}")
         
         # Decode content if necessary
@@ -65,17 +92,21 @@ def scrape_url(url, headers=headers, delay=MIN_DELAY):
 
         # Parse and extract the main content using newspaper3k with the fetched HTML
         page_text = extract_main_content(html_content, url)
-        if not page_text:
-            logging.warning(f"No content extracted from {url}. Skipping.")
+        # Learn from the outcome so similar non-article URLs are skipped before fetching
+        if url_classifier is not None:
+            url_classifier.record(url, is_article_text(page_text))
+        if not is_article_text(page_text):
+            logging.warning(f"No article content extracted from {url}. Skipping.")
             return None
         logging.info(f"Successfully scraped URL: {url}")
-        return {'url': url, 'content': page_text}
+        return make_document(url, page_text, response.status_code)
 
     except Exception as e:
         logging.error(f"Error scraping {url}: {e}")
         return None
 
-def crawl_website(start_url, visited, robots_parser=None, depth=0, max_depth=MAX_DEPTH, headers=headers, crawl_count=0, delay=MIN_DELAY):
+def crawl_website(start_url, visited, robots_parser=None, depth=0, max_depth=MAX_DEPTH, headers=headers, crawl_count=0, delay=MIN_DELAY, url_classifier=None,
+                  retry_queue=None, circuit_breaker=None):
     """
     Recursively scrapes a website starting from the given URL.
 
@@ -86,13 +117,23 @@ def crawl_website(start_url, visited, robots_parser=None, depth=0, max_depth=MAX
         headers (dict): HTTP headers to include in requests.
         visited (set): Set of already visited URLs.
         delay (float): Delay between requests in seconds.
+        url_classifier (URLClassifier): Classifier deciding which links are worth fetching.
+            Defaults to one built from the start URL's site patterns.
+        retry_queue (RetryQueue): Queue for failed fetches, retried while other URLs are crawled.
+        circuit_breaker (CircuitBreaker): Per-host circuit breaker pausing failing hosts.
 
     Returns:
         list: A list of Document objects containing scraped content.
     """
     articles = []
+    if url_classifier is None:
+        url_classifier = URLClassifier.for_site(start_url)
+    if retry_queue is None:
+        retry_queue = RetryQueue()
+    if circuit_breaker is None:
+        circuit_breaker = CircuitBreaker()
     
-    def crawl(url, current_depth, crawl_count, delay):
+    def crawl(url, current_depth, crawl_count, delay, attempt=0):
 
         # Stop crawling if the counter has reached the maximum allowed crawls
         if current_depth > max_depth or url in visited or (crawl_count >= MAX_CRAWL_COUNT and MAX_CRAWL_COUNT != -1):
@@ -108,7 +149,10 @@ def crawl_website(start_url, visited, robots_parser=None, depth=0, max_depth=MAX
         
         
         try:
-            response = make_request(url, headers=headers)
+            # Failed fetches go to the retry queue instead of blocking the crawl
+            response = fetch_or_defer(url, retry_queue, circuit_breaker, attempt, context=current_depth, headers=headers)
+            if response is None:
+                return articles
             logging.debug(f"Received response for {url} with status code {response.status_code}")
             # Decode content if necessary
             if response.encoding is None:
@@ -117,26 +161,45 @@ def crawl_website(start_url, visited, robots_parser=None, depth=0, max_depth=MAX
 
             # Get and store the main content of the article
             page_text = extract_main_content(html_content, url)
-            if not page_text:
-                logging.warning(f"No content extracted from {url}.")
+            # Learn from the outcome so similar non-article links are skipped before fetching
+            url_classifier.record(url, is_article_text(page_text))
+            if not is_article_text(page_text):
+                logging.warning(f"No article content extracted from {url}.")
                 return articles
             
-            if page_text:
-                articles.append({'url': url, 'content': page_text})
+            articles.append(make_document(url, page_text, response.status_code))
             
             # Find links to other articles and crawl them
-            links, delay = find_article_links(url, visited, delay)
+            links, delay = find_article_links(url, visited, delay, url_classifier, html_content=html_content)
             for link in links:
-                logging.info(f"Waiting for {delay} seconds before scraping {link}")
-                time.sleep(delay)
+                if not host_paused(link, circuit_breaker):
+                    logging.info(f"Waiting for {delay} seconds before scraping {link}")
+                    time.sleep(delay)
                 if (crawl_count <= MAX_CRAWL_COUNT or MAX_CRAWL_COUNT == -1):
                     crawl(link, current_depth + 1, crawl_count, delay)
+                retry_due(crawl_count, delay)
         except Exception as e:
             logging.error(f"Failed to retrieve {url}: {e}")
             return articles
-            
+
+    def retry_due(crawl_count, delay):
+        for url, attempt, url_depth in retry_queue.pop_due():
+            if not host_paused(url, circuit_breaker):
+                logging.info(f"Waiting for {delay} seconds before retrying {url}")
+                time.sleep(delay)
+            # Deferred URLs were marked as visited when they were first tried
+            visited.discard(url)
+            crawl(url, url_depth, crawl_count, delay, attempt)
 
     # Start crawling from the start URL
     crawl(start_url, depth, crawl_count, delay)
 
+    # Only wait for deferred URLs once there is nothing else left to crawl
+    while retry_queue:
+        wait_time = retry_queue.time_until_next()
+        if wait_time:
+            logging.info(f"{len(retry_queue)} URLs waiting to be retried. Next retry in {wait_time:.0f} seconds.")
+            time.sleep(wait_time)
+        retry_due(crawl_count, delay)
+
     return articles
\ No newline at end of file
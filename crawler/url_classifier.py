@@ -0,0 +1,185 @@
+import logging
+import math
+import re
+from collections import defaultdict
+from urllib.parse import unquote, urlparse
+from config import (URL_SKIP_THRESHOLD, URL_MIN_OBSERVATIONS, URL_MIN_FEATURE_SUPPORT,
+                    DEFAULT_URL_EXCLUDE_PATTERNS, URL_PATTERNS)
+
+DATE_PATH_RE = re.compile(r'/(19|20)\d{2}/\d{1,2}(/|$)')
+LONG_ID_RE = re.compile(r'\d{4,}')
+PAGINATION_RE = re.compile(r'/(page|p)/\d+(/|$)')
+
+
+class URLClassifier:
+    """
+    Lightweight online classifier that predicts whether a URL is an article page
+    before it is fetched.
+
+    It is a naive Bayes model over path-segment and regex features, trained from
+    extraction outcomes (article text vs. no content) as the crawl goes on.
+    Per-site include/exclude patterns take precedence over the learned model.
+    """
+
+    def __init__(self, include_patterns=None, exclude_patterns=None, skip_threshold=URL_SKIP_THRESHOLD,
+                 min_observations=URL_MIN_OBSERVATIONS, min_feature_support=URL_MIN_FEATURE_SUPPORT):
+        """
+        Args:
+            include_patterns (list): Regexes for URL paths that are always fetched.
+            exclude_patterns (list): Regexes for URL paths that are never fetched.
+            skip_threshold (float): Article probability below which a URL is skipped.
+            min_observations (int): Outcomes to observe before the model may skip URLs.
+            min_feature_support (int): Observations one of a URL's features needs before it may be skipped.
+        """
+        self.include_patterns = [re.compile(p) for p in include_patterns or []]
+        self.exclude_patterns = [re.compile(p) for p in exclude_patterns or []]
+        self.skip_threshold = skip_threshold
+        self.min_observations = min_observations
+        self.min_feature_support = min_feature_support
+        # Per-class counts: index 1 for article pages, 0 for pages with no content
+        self.class_counts = [0, 0]
+        self.feature_counts = defaultdict(lambda: [0, 0])
+
+    @classmethod
+    def for_site(cls, url):
+        """
+        Builds a classifier using the patterns configured for the URL's host.
+
+        Args:
+            url (str): Any URL on the site (usually the start URL).
+
+        Returns:
+            URLClassifier: A classifier for that site.
+        """
+        site_patterns = URL_PATTERNS.get(urlparse(url).netloc, {})
+        return cls(include_patterns=site_patterns.get('include', []),
+                   exclude_patterns=DEFAULT_URL_EXCLUDE_PATTERNS + site_patterns.get('exclude', []))
+
+    @staticmethod
+    def features(url):
+        """
+        Extracts path-segment and regex features from a URL.
+
+        Args:
+            url (str): The URL to extract features from.
+
+        Returns:
+            set: The feature strings for the URL.
+        """
+        path = unquote(urlparse(url).path).lower()
+        segments = [s for s in path.split('/') if s]
+        features = {f"depth:{min(len(segments), 5)}"}
+        shape = []
+        for idx, segment in enumerate(segments):
+            if segment.isdigit():
+                token = '<num>'
+            elif len(segment) > 30 or segment.count('-') >= 3:
+                token = '<slug>'
+            else:
+                token = segment
+            shape.append(token)
+            # Only the leading segments are site sections (tag, category, news, ...)
+            if idx < 2:
+                features.add(f"seg{idx}:{token}")
+        features.add(f"shape:/{'/'.join(shape)}")
+        if segments:
+            features.add(f"last:{shape[-1] if shape[-1].startswith('<') else 'word'}")
+        if DATE_PATH_RE.search(path):
+            features.add('has_date')
+        if LONG_ID_RE.search(path):
+            features.add('has_long_id')
+        if PAGINATION_RE.search(path):
+            features.add('pagination')
+        if path.endswith(('.html', '.htm', '.php', '.aspx')):
+            features.add('page_extension')
+        return features
+
+    def _match_patterns(self, url):
+        """Returns True for included URLs, False for excluded ones, None if no pattern matches."""
+        path = urlparse(url).path
+        if any(p.search(path) for p in self.include_patterns):
+            return True
+        if any(p.search(path) for p in self.exclude_patterns):
+            return False
+        return None
+
+    def record(self, url, is_article):
+        """
+        Learns from the extraction outcome of a fetched URL.
+
+        Args:
+            url (str): The fetched URL.
+            is_article (bool): True if article text was extracted, False otherwise.
+        """
+        label = 1 if is_article else 0
+        self.class_counts[label] += 1
+        for feature in self.features(url):
+            self.feature_counts[feature][label] += 1
+
+    def score(self, url):
+        """
+        Predicts the probability that a URL is an article page.
+
+        Args:
+            url (str): The URL to score.
+
+        Returns:
+            float: The article probability, between 0 and 1.
+        """
+        matched = self._match_patterns(url)
+        if matched is not None:
+            return 1.0 if matched else 0.0
+
+        others, articles = self.class_counts
+        # Laplace-smoothed log odds
+        log_odds = math.log((articles + 1) / (others + 1))
+        for feature in self.features(url):
+            if feature not in self.feature_counts:
+                continue
+            other_count, article_count = self.feature_counts[feature]
+            log_odds += math.log((article_count + 1) / (articles + 2))
+            log_odds -= math.log((other_count + 1) / (others + 2))
+        log_odds = max(-30.0, min(30.0, log_odds))
+        return 1 / (1 + math.exp(-log_odds))
+
+    def should_fetch(self, url):
+        """
+        Decides whether a URL is worth fetching.
+
+        The learned model only skips URLs once it has seen enough outcomes, and only
+        for URLs that share a well-observed feature, so new URL shapes are still explored.
+
+        Args:
+            url (str): The URL to check.
+
+        Returns:
+            bool: True if the URL should be fetched, False if it should be skipped.
+        """
+        matched = self._match_patterns(url)
+        if matched is not None:
+            return matched
+        if sum(self.class_counts) < self.min_observations:
+            return True
+        supported = any(sum(self.feature_counts[f]) >= self.min_feature_support
+                        for f in self.features(url) if f in self.feature_counts)
+        score = self.score(url)
+        if supported and score < self.skip_threshold:
+            logging.debug(f"Skipping {url}: article probability {score:.2f}")
+            return False
+        return True
+
+    def prioritize(self, urls):
+        """
+        Drops URLs that should not be fetched and orders the rest by article probability.
+
+        Args:
+            urls (list): The candidate URLs.
+
+        Returns:
+            list: The URLs to fetch, most likely articles first.
+        """
+        kept = [url for url in urls if self.should_fetch(url)]
+        skipped = len(urls) - len(kept)
+        if skipped:
+            logging.info(f"URL classifier skipped {skipped} of {len(urls)} links.")
+        return sorted(kept, key=self.score, reverse=True)
@@ -1,8 +1,11 @@
 import logging
+import hashlib
 import json
 import os
+from datetime import datetime, timezone
 from urllib.parse import quote, urlparse
-from config import LOG_FILE, LOG_LEVEL, LOG_FORMAT, LOG_DATE_FORMAT, OUTPUT_DIR
+from config import (LOG_FILE, LOG_LEVEL, LOG_FORMAT, LOG_DATE_FORMAT, OUTPUT_DIR, OUTPUT_FORMAT,
+                    PARQUET_ROW_GROUP_SIZE, PARQUET_COMPRESSION)
 
 DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
 # Custom headers including a User-Agent
@@ -10,11 +13,30 @@ headers = {
     'User-Agent': DEFAULT_USER_AGENT
 }
 
-def get_scraped_filename(start_url):
+def get_scraped_filename(start_url, extension='json'):
     parsed_start_url = urlparse(start_url)
-    filename = f"{parsed_start_url.netloc}_scraped_data.json"
+    filename = f"{parsed_start_url.netloc}_scraped_data.{extension}"
     return filename
 
+def make_document(url, content, status=200):
+    """
+    Builds the record stored for a scraped page.
+
+    Args:
+        url (str): The scraped URL.
+        content (str): The extracted text content.
+        status (int): The HTTP status code of the response.
+
+    Returns:
+        dict: The document with its URL, content, status and UTC fetch time.
+    """
+    return {
+        'url': url,
+        'content': content,
+        'status': status,
+        'fetched_at': datetime.now(timezone.utc).isoformat(),
+    }
+
 def setup_logging():
     """
     Sets up the logging configuration for the crawler.
@@ -114,6 +136,92 @@ def save_json(data, start_url):
 
     logging.info(f"Scraped data has been saved to {filename}")
 
+def save_parquet(data, start_url, row_group_size=PARQUET_ROW_GROUP_SIZE, compression=PARQUET_COMPRESSION):
+    """
+    Saves scraped documents to a Parquet file, one row group per batch of documents.
+
+    The host and status columns are dictionary-encoded and all columns compressed,
+    so downstream jobs can read only the columns they need.
+
+    Args:
+        data (list): The scraped documents.
+        start_url (str): The start URL of the crawl, used to name the file.
+        row_group_size (int): Number of documents per row group.
+        compression (str): Compression codec for the columns.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        logging.error("pyarrow is required for Parquet output. Install it with 'pip install pyarrow'.")
+        raise
+
+    schema = pa.schema([
+        ('url', pa.string()),
+        ('host', pa.dictionary(pa.int32(), pa.string())),
+        ('status', pa.int16()),
+        ('fetched_at', pa.timestamp('ms', tz='UTC')),
+        ('content_length', pa.int64()),
+        ('content_hash', pa.string()),
+        ('content', pa.large_string()),
+    ])
+
+    filename = get_scraped_filename(start_url, extension='parquet')
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    documents = [doc for doc in data if doc]
+    with pq.ParquetWriter(filepath, schema,
+                          use_dictionary=['host', 'status'],
+                          compression=compression) as writer:
+        for start in range(0, len(documents), row_group_size):
+            batch = documents[start:start + row_group_size]
+            contents = [doc['content'] for doc in batch]
+            record_batch = pa.record_batch([
+                pa.array([doc['url'] for doc in batch], pa.string()),
+                pa.array([urlparse(doc['url']).netloc for doc in batch], pa.string()).dictionary_encode(),
+                pa.array([doc.get('status') for doc in batch], pa.int16()),
+                pa.array([datetime.fromisoformat(doc['fetched_at']) if doc.get('fetched_at') else None
+                          for doc in batch], pa.timestamp('ms', tz='UTC')),
+                pa.array([len(content) for content in contents], pa.int64()),
+                pa.array([hashlib.sha256(content.encode('utf-8')).hexdigest() for content in contents], pa.string()),
+                pa.array(contents, pa.large_string()),
+            ], schema=schema)
+            writer.write_batch(record_batch, row_group_size=row_group_size)
+
+    logging.info(f"Scraped data has been saved to {filename}")
+
+def load_parquet(filepath, columns=None):
+    """
+    Loads scraped documents from a Parquet file.
+
+    Args:
+        filepath (str): The path to the Parquet file.
+        columns (list): Optional list of columns to read; all columns are read if None.
+
+    Returns:
+        list: The loaded documents as dictionaries.
+    """
+    import pyarrow.parquet as pq
+
+    return pq.read_table(filepath, columns=columns).to_pylist()
+
+def save_output(data, start_url, output_format=OUTPUT_FORMAT):
+    """
+    Saves scraped documents in the configured output format.
+
+    Args:
+        data (list): The scraped documents.
+        start_url (str): The start URL of the crawl, used to name the file.
+        output_format (str): 'json' or 'parquet'.
+    """
+    if output_format == 'parquet':
+        save_parquet(data, start_url)
+    elif output_format == 'json':
+        save_json(data, start_url)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+
 def get_timestamp():
     """
     Returns the current timestamp as a string.
@@ -19,6 +19,10 @@ setup(
         'lxml_html_clean',
         'nltk',
     ],
+    extras_require={
+        'parquet': ['pyarrow'],
+        'css': ['cssselect'],
+    },
     entry_points={
         'console_scripts': [
             'PyCrawl=crawler.main:main',
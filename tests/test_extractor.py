@@ -0,0 +1,53 @@
+import unittest
+from crawler.extractor import extract_main_content, extract_with_density, extract_with_rules
+
+ARTICLE_HTML = '''
+<html><body>
+<nav><a href="/">Home</a> <a href="/about">About us and our newsroom</a></nav>
+<div class="sidebar"><p>Popular: <a href="/x">a long list of popular links</a></p></div>
+<div class="entry-content">
+  <p>این یک متن نمونه است، که برای آزمایش استخراج کننده نوشته شده است، و باید باقی بماند.</p>
+  <p>The second paragraph has enough words, commas, and content to be counted as prose.</p>
+  <div class="share-buttons"><p>Share this article on all of your social networks.</p></div>
+</div>
+<footer><p>Copyright 2024, all rights reserved by the publisher.</p></footer>
+</body></html>
+'''
+
+class TestExtractor(unittest.TestCase):
+    def test_density_extractor_skips_boilerplate(self):
+        text = extract_with_density(ARTICLE_HTML, 'https://example.com/a')
+        self.assertIn('این یک متن نمونه است', text)
+        self.assertIn('The second paragraph', text)
+        for boilerplate in ('Popular', 'Share this', 'Copyright', 'Home'):
+            self.assertNotIn(boilerplate, text)
+
+    def test_density_extractor_keeps_page_wide_form(self):
+        html = ARTICLE_HTML.replace('<body>', '<body><form id="form1" method="post">').replace(
+            '</body>', '<form class="search"><input name="q"></form></form></body>')
+        text = extract_with_density(html, 'https://example.com/a')
+        self.assertIn('The second paragraph', text)
+
+    def test_rules_extractor(self):
+        rules = {'content': '//div[@class="entry-content"]/p'}
+        text = extract_with_rules(ARTICLE_HTML, 'https://example.com/a', rules)
+        self.assertEqual(text.count('\n\n'), 1)
+        self.assertNotIn('Share this', text)
+        self.assertEqual(extract_with_rules(ARTICLE_HTML, 'https://unknown.example.com/a'), '')
+
+    def test_falls_back_when_text_is_too_short(self):
+        # No rules are configured for example.com, so the density extractor is used
+        text = extract_main_content(ARTICLE_HTML, 'https://example.com/a', extractors=['rules', 'density'],
+                                    min_length=100)
+        self.assertIn('The second paragraph', text)
+        self.assertEqual(extract_main_content('<html><body></body></html>', 'https://example.com/a',
+                                              extractors=['rules', 'density']), '')
+
+    def test_returns_nothing_when_all_are_short(self):
+        # The density text is shorter than min_length and the rules backend returns nothing
+        text = extract_main_content(ARTICLE_HTML, 'https://example.com/a', extractors=['density', 'rules'],
+                                    min_length=10000)
+        self.assertEqual(text, '')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from crawler.indexer import InvertedIndex, decode_postings, encode_postings, tokenize
+
+class TestIndexer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_tokenize_normalizes_persian_and_arabic(self):
+        self.assertEqual(tokenize('كتاب'), tokenize('کتاب'))
+        self.assertEqual(tokenize('ي'), tokenize('ی'))
+        self.assertEqual(tokenize('می‌روم'), ['میروم'])
+        self.assertEqual(tokenize('سال ۱۴۰۳'), ['سال', '1403'])
+        self.assertEqual(tokenize('Hello, World'), ['hello', 'world'])
+
+    def test_postings_round_trip(self):
+        postings = [(0, 1), (5, 3), (300, 1), (100000, 250)]
+        self.assertEqual(decode_postings(encode_postings(postings)), postings)
+
+    def test_incremental_updates_and_merging(self):
+        with InvertedIndex(self.tmp_dir.name, flush_docs=2, merge_factor=2) as index:
+            for i in range(7):
+                index.add_document(f'https://example.com/{i}', f'common word{i}')
+            self.assertIsNone(index.add_document('https://example.com/0', 'common word0'))
+            # Buffered documents are searchable before they are flushed
+            self.assertEqual(index.boolean_search('word6'), ['https://example.com/6'])
+
+        with InvertedIndex(self.tmp_dir.name, flush_docs=2, merge_factor=2) as index:
+            self.assertEqual(len(index), 7)
+            self.assertLess(len(index.segments), 4)
+            self.assertEqual(len(index.boolean_search('common')), 7)
+            self.assertEqual(index.boolean_search('common -word3 -word4'),
+                             [f'https://example.com/{i}' for i in (0, 1, 2, 5, 6)])
+            self.assertEqual(index.boolean_search('word1 OR word2'),
+                             ['https://example.com/1', 'https://example.com/2'])
+
+    def test_boolean_and_keyword(self):
+        with InvertedIndex(self.tmp_dir.name) as index:
+            index.add_documents([
+                {'url': 'a', 'content': 'tehran shiraz'},
+                {'url': 'b', 'content': 'tehran weather'},
+            ])
+            self.assertEqual(index.boolean_search('tehran AND shiraz'), ['a'])
+            self.assertEqual(index.boolean_search('tehran AND NOT shiraz'), ['b'])
+
+    def test_merge_keeps_all_postings(self):
+        with InvertedIndex(self.tmp_dir.name, flush_docs=1, merge_factor=3) as index:
+            for i in range(9):
+                index.add_document(f'u{i}', f'common only{i}' + (' even' if i % 2 == 0 else ''))
+            self.assertEqual(len(index.segments), 1)
+            self.assertEqual(index.postings('common'), [(i, 1) for i in range(9)])
+            self.assertEqual([doc_id for doc_id, _ in index.postings('even')], [0, 2, 4, 6, 8])
+            self.assertEqual(index.postings('only7'), [(7, 1)])
+
+    def test_changed_content_replaces_document(self):
+        with InvertedIndex(self.tmp_dir.name, flush_docs=1, merge_factor=4) as index:
+            index.add_document('a', 'tehran weather')
+            index.add_document('b', 'shiraz weather')
+            self.assertIsNone(index.add_document('a', 'tehran weather'))
+            self.assertIsNotNone(index.add_document('a', 'tehran traffic'))
+
+        with InvertedIndex(self.tmp_dir.name, flush_docs=1, merge_factor=4) as index:
+            self.assertEqual(index.deleted, {0})
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.boolean_search('weather'), ['b'])
+            self.assertEqual(index.boolean_search('traffic'), ['a'])
+            self.assertEqual([url for _, url in index.search('tehran')], ['a'])
+            # The replaced version is dropped once its segment is merged
+            index.add_document('c', 'isfahan weather')
+            self.assertEqual(len(index.segments), 1)
+            self.assertEqual(index.deleted, set())
+            self.assertEqual(index.postings('weather'), [(1, 1), (3, 1)])
+
+    def test_bm25_ranking(self):
+        with InvertedIndex(self.tmp_dir.name) as index:
+            index.add_documents([
+                {'url': 'a', 'content': 'tehran weather report'},
+                {'url': 'b', 'content': 'tehran tehran tehran news'},
+                {'url': 'c', 'content': 'shiraz news'},
+            ])
+            results = index.search('tehran')
+            self.assertEqual([url for _, url in results], ['b', 'a'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,10 @@
 import unittest
-from crawler.requester import make_request
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+from requests.exceptions import HTTPError
+from crawler.requester import RetryableRequestError, backoff_delay, fetch_or_defer, make_request
+from crawler.retry_queue import CircuitBreaker, RetryQueue
 
 class TestRequester(unittest.TestCase):
     def test_make_request_success(self):
@@ -12,5 +17,78 @@ class TestRequester(unittest.TestCase):
         with self.assertRaises(Exception):
             make_request(url)
 
+class TestBackoffDelay(unittest.TestCase):
+    def test_retry_after_seconds(self):
+        self.assertEqual(backoff_delay(3, '120'), 120)
+
+    def test_retry_after_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=300)
+        wait_time = backoff_delay(1, format_datetime(retry_at, usegmt=True))
+        self.assertTrue(290 < wait_time <= 300)
+
+    def test_falls_back_to_exponential_backoff(self):
+        self.assertEqual(backoff_delay(3, delay=2), 8)
+        self.assertEqual(backoff_delay(3, 'not a date', delay=2), 8)
+        self.assertEqual(backoff_delay(3, 'Wed, 21 Oct 2015 07:28:00 GMT', delay=2), 8)
+
+class TestFetchOrDefer(unittest.TestCase):
+    def test_dead_host_is_probed_with_growing_pauses(self):
+        clock = [0.0]
+        queue = RetryQueue()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, max_reset_timeout=240)
+        urls = [f'https://down.example.com/{i}' for i in range(100)]
+        probe_times = []
+
+        def fetch(url, headers=None):
+            probe_times.append(clock[0])
+            raise RetryableRequestError('down')
+
+        with mock.patch('time.monotonic', side_effect=lambda: clock[0]), \
+                mock.patch('crawler.requester.fetch_once', side_effect=fetch):
+            for url in urls:
+                self.assertIsNone(fetch_or_defer(url, queue, breaker, max_retries=2))
+            # Drain the queue the way the crawler does, advancing the clock instead of sleeping
+            while queue:
+                clock[0] += queue.time_until_next()
+                for url, attempt, context in queue.pop_due():
+                    self.assertIsNone(fetch_or_defer(url, queue, breaker, attempt, context, max_retries=2))
+
+        # Two failures open the circuit, then one request per probe until every URL ran out of attempts
+        self.assertEqual(len(probe_times), 2 * len(urls))
+        pauses = [later - earlier for earlier, later in zip(probe_times[2:], probe_times[3:])]
+        self.assertEqual(pauses[:4], [120, 240, 240, 240])
+        self.assertEqual(breaker.state('down.example.com'), CircuitBreaker.OPEN)
+
+    def test_host_recovers_after_probe(self):
+        clock = [0.0]
+        queue = RetryQueue()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        response = mock.Mock(status_code=200)
+
+        with mock.patch('time.monotonic', side_effect=lambda: clock[0]), \
+                mock.patch('crawler.requester.fetch_once',
+                           side_effect=[RetryableRequestError('down'), response, response]):
+            self.assertIsNone(fetch_or_defer('https://example.com/a', queue, breaker))
+            self.assertIsNone(fetch_or_defer('https://example.com/b', queue, breaker))
+            clock[0] = 60
+            results = [fetch_or_defer(url, queue, breaker, attempt) for url, attempt, _ in queue.pop_due()]
+
+        self.assertEqual(results, [response, response])
+        self.assertEqual(breaker.state('example.com'), CircuitBreaker.CLOSED)
+
+    def test_gone_page_is_not_retried(self):
+        queue = RetryQueue()
+        breaker = CircuitBreaker(failure_threshold=1)
+        response = mock.Mock(status_code=410, headers={})
+
+        with mock.patch('crawler.requester.requests.get', return_value=response) as get:
+            with self.assertRaises(HTTPError):
+                fetch_or_defer('https://example.com/removed', queue, breaker)
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(len(queue), 0)
+        # A single counted failure would have opened the circuit
+        self.assertEqual(breaker.state('example.com'), CircuitBreaker.CLOSED)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from crawler.retry_queue import CircuitBreaker, RetryQueue
+
+class TestRetryQueue(unittest.TestCase):
+    def test_pop_due_in_time_order(self):
+        queue = RetryQueue()
+        queue.push('https://example.com/b', 20, 1)
+        queue.push('https://example.com/a', 10, 2, context=3)
+        queue.push('https://example.com/c', 30, 1)
+        self.assertEqual(queue.time_until_next(now=5), 5)
+        self.assertEqual(queue.pop_due(now=20), [('https://example.com/a', 2, 3), ('https://example.com/b', 1, None)])
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.pop_due(now=25), [])
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_probes_and_closes(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        host = 'example.com'
+        breaker.record_failure(host, now=0)
+        self.assertTrue(breaker.allow(host, now=1))
+        breaker.record_failure(host, now=1)
+        self.assertFalse(breaker.allow(host, now=30))
+        self.assertEqual(breaker.retry_time(host), 61)
+
+        # One probe is allowed once the reset timeout has passed
+        self.assertTrue(breaker.allow(host, now=61))
+        self.assertFalse(breaker.allow(host, now=62))
+        breaker.record_success(host)
+        self.assertEqual(breaker.state(host), CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow(host, now=63))
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure('example.com', now=0)
+        self.assertTrue(breaker.allow('example.com', now=10))
+        breaker.record_failure('example.com', now=10)
+        self.assertEqual(breaker.state('example.com'), CircuitBreaker.OPEN)
+        # The pause doubles after a failed probe
+        self.assertFalse(breaker.allow('example.com', now=20))
+        self.assertTrue(breaker.allow('example.com', now=30))
+
+    def test_is_paused_does_not_send_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, max_reset_timeout=15)
+        breaker.record_failure('example.com', now=0)
+        self.assertTrue(breaker.is_paused('example.com', now=5))
+        self.assertFalse(breaker.is_paused('example.com', now=10))
+        self.assertEqual(breaker.state('example.com'), CircuitBreaker.OPEN)
+        # A failed probe pauses the host again, for at most max_reset_timeout
+        self.assertTrue(breaker.allow('example.com', now=10))
+        breaker.record_failure('example.com', now=10)
+        self.assertTrue(breaker.is_paused('example.com', now=24))
+        self.assertFalse(breaker.is_paused('example.com', now=25))
+
+if __name__ == '__main__':
+    unittest.main()
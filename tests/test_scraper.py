@@ -0,0 +1,27 @@
+import unittest
+from unittest import mock
+from crawler.scraper import scrape_url
+from crawler.url_classifier import URLClassifier
+
+EXCERPT = 'Inflation slowed in September, according to figures released on Monday by the central bank.'
+ARTICLE = ' '.join([EXCERPT] * 10)
+
+class TestScrapeUrl(unittest.TestCase):
+    def scrape(self, url, text, url_classifier):
+        response = mock.Mock(status_code=200, encoding='utf-8', text='<html></html>')
+        with mock.patch('crawler.scraper.make_request', return_value=response), \
+                mock.patch('crawler.scraper.extract_main_content', return_value=text):
+            return scrape_url(url, delay=0, url_classifier=url_classifier)
+
+    def test_listing_excerpt_is_not_an_article(self):
+        classifier = URLClassifier(min_observations=10, min_feature_support=3)
+        for i in range(10):
+            # Tag pages only yield the first excerpt of the listing
+            self.assertIsNone(self.scrape(f'https://example.com/tag/topic-{i}', EXCERPT, classifier))
+            doc = self.scrape(f'https://example.com/2024/05/inflation-slowed-in-september-{i}', ARTICLE, classifier)
+            self.assertEqual(doc['content'], ARTICLE)
+        self.assertFalse(classifier.should_fetch('https://example.com/tag/economy'))
+        self.assertTrue(classifier.should_fetch('https://example.com/2024/06/rates-held-steady-again-today'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from crawler.url_classifier import URLClassifier
+
+class TestURLClassifier(unittest.TestCase):
+    def test_patterns_override_model(self):
+        classifier = URLClassifier(include_patterns=[r'^/news/'], exclude_patterns=[r'/login'])
+        self.assertTrue(classifier.should_fetch('https://example.com/news/tag/x'))
+        self.assertFalse(classifier.should_fetch('https://example.com/login'))
+
+    def test_learns_to_skip_non_article_sections(self):
+        classifier = URLClassifier(min_observations=10, min_feature_support=3)
+        for i in range(10):
+            classifier.record(f'https://example.com/tag/topic-{i}', False)
+            classifier.record(f'https://example.com/2024/05/some-long-article-title-{i}', True)
+        self.assertFalse(classifier.should_fetch('https://example.com/tag/another'))
+        self.assertTrue(classifier.should_fetch('https://example.com/2024/06/yet-another-article-title'))
+
+    def test_does_not_skip_before_enough_observations(self):
+        classifier = URLClassifier(min_observations=10)
+        classifier.record('https://example.com/tag/a', False)
+        self.assertTrue(classifier.should_fetch('https://example.com/tag/b'))
+
+    def test_prioritize_orders_by_score(self):
+        classifier = URLClassifier(min_observations=100)
+        for i in range(5):
+            classifier.record(f'https://example.com/category/c{i}', False)
+            classifier.record(f'https://example.com/article/{1000 + i}', True)
+        urls = ['https://example.com/category/z', 'https://example.com/article/2000']
+        self.assertEqual(classifier.prioritize(urls), list(reversed(urls)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from crawler.utils import make_document, save_output
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+    from crawler.utils import get_scraped_filename, load_parquet, save_parquet
+except ImportError:
+    pyarrow = None
+
+START_URL = 'https://example.com/'
+
+class TestSaveOutput(unittest.TestCase):
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            save_output([], START_URL, output_format='csv')
+
+@unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+class TestParquet(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = mock.patch('crawler.utils.OUTPUT_DIR', tmp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.filepath = os.path.join(tmp_dir.name, get_scraped_filename(START_URL, extension='parquet'))
+        self.documents = [make_document(f'https://example.com/{i}', f'content {i}') for i in range(5)]
+
+    def test_round_trip(self):
+        save_parquet(self.documents[:3] + [None] + self.documents[3:], START_URL, row_group_size=2)
+
+        self.assertEqual(pq.ParquetFile(self.filepath).num_row_groups, 3)
+        table = pq.read_table(self.filepath)
+        self.assertTrue(pyarrow.types.is_dictionary(table.schema.field('host').type))
+
+        rows = load_parquet(self.filepath)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([row['url'] for row in rows], [doc['url'] for doc in self.documents])
+        self.assertEqual(rows[0]['host'], 'example.com')
+        self.assertEqual(rows[0]['status'], 200)
+        self.assertEqual(rows[0]['content_length'], len('content 0'))
+
+    def test_column_subset(self):
+        save_parquet(self.documents, START_URL)
+        rows = load_parquet(self.filepath, columns=['url', 'content_length'])
+        self.assertEqual(set(rows[0]), {'url', 'content_length'})
+
+    def test_save_output_parquet(self):
+        save_output(self.documents, START_URL, output_format='parquet')
+        self.assertEqual(len(load_parquet(self.filepath)), 5)
+
+if __name__ == '__main__':
+    unittest.main()